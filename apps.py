@@ -5,9 +5,7 @@ class PaperlessMediaConfig(AppConfig):
 
     def ready(self):
         from documents.signals import document_consumer_declaration
+        # Importing the signals module also registers its pre_save receiver
         from paperless_media.signals import media_consumer_declaration
-        import paperless_media.signals
 
         document_consumer_declaration.connect(media_consumer_declaration)
-
-        AppConfig.ready(self)
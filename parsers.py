@@ -1,28 +1,84 @@
+from functools import lru_cache
 from pathlib import Path
-import random
+import hashlib
 import os
+import re
+import shutil
 
 from django.conf import settings
-from PIL import Image, ImageDraw, ImageFont
 
 from documents.parsers import DocumentParser
 
+# Words counted when deciding if extracted text is meaningful
+_WORD_RE = re.compile(r"\b\w+\b")
+
+# Anything other than A-Z, a-z, 0-9, whitespace and standard special characters
+_SANITIZE_RE = re.compile(r"[^A-Za-z0-9!@#$%^&*()_+\-=\[\]{}\\|;:'\",<.>/?`~\s]")
+
+# Bytes removed from raw file data by parse(): every non-ASCII byte plus the
+# ASCII characters matched by _SANITIZE_RE (this includes null bytes)
+_SANITIZE_DELETE_BYTES = bytes(
+    b for b in range(256) if b >= 0x80 or _SANITIZE_RE.match(chr(b))
+)
+
+# Rendered extension icons are cached here, keyed by extension and font.
+# Bump the version whenever the icon rendering changes.
+_THUMB_CACHE_DIR = "ppm_thumb_cache"
+_THUMB_CACHE_VERSION = 2
+
+
+@lru_cache(maxsize=8)
+def _load_font(font_name, font_size):
+    """Load a TrueType font once per (name, size) instead of per thumbnail"""
+    from PIL import ImageFont
+
+    return ImageFont.truetype(
+        font=font_name,
+        size=font_size,
+        layout_engine=ImageFont.Layout.BASIC,
+    )
+
+
+def _read_head(path, size):
+    """Read up to size bytes from the start of a file without updating its atime"""
+    flags = os.O_RDONLY | getattr(os, "O_NOATIME", 0)
+    try:
+        fd = os.open(path, flags)
+    except PermissionError:
+        # O_NOATIME is only allowed for the file's owner
+        fd = os.open(path, os.O_RDONLY)
+    try:
+        # A single read may return less than requested (e.g. on NFS or FUSE),
+        # so keep reading until we have size bytes or reach EOF
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
 class MediaDocumentParser(DocumentParser):
     logging_name = "paperless.parsing.media"
 
-    def get_random_color(self):
-        """Generate a random, visually pleasing background color"""
-        # Using pastel colors for better readability
-        return (
-            random.randint(100, 200),  # R
-            random.randint(100, 200),  # G
-            random.randint(100, 200),  # B
-        )
+    def get_background_color(self, ext):
+        """Derive a visually pleasing background color from the file extension"""
+        # Using pastel colors for better readability; the same extension
+        # always gets the same color so its icon can be cached
+        digest = hashlib.blake2b(ext.encode(), digest_size=3).digest()
+        return tuple(100 + b % 101 for b in digest)
 
     def get_text_color(self, background_color):
         """Determine if text should be black or white based on background brightness"""
-        brightness = sum(background_color) / 3
-        return "black" if brightness > 150 else "white"
+        # Rec. 709 luma with integer weights scaled to sum to 2**13
+        r, g, b = background_color
+        luma = (1742 * r + 5859 * g + 591 * b) >> 13
+        return "black" if luma > 140 else "white"
 
     def get_thumbnail(self, document_path: Path, mime_type, file_name=None) -> Path:
         # Check if the file is a video based on MIME type
@@ -47,19 +103,31 @@ class MediaDocumentParser(DocumentParser):
         # Remove the dot if it exists
         ext = ext.lstrip('.')
 
+        # The icon only depends on the extension, so reuse a cached render
+        out_path = self.tempdir / "thumb.webp"
+        cache_key = f"{_THUMB_CACHE_VERSION}\0{settings.THUMBNAIL_FONT_NAME}\0{ext}"
+        cache_path = (
+            Path(settings.DATA_DIR)
+            / _THUMB_CACHE_DIR
+            / f"{hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest()}.webp"
+        )
+        try:
+            shutil.copyfile(cache_path, out_path)
+            return out_path
+        except OSError:
+            pass
+
+        from PIL import Image, ImageDraw
+
         # Create a square thumbnail
         size = (400, 400)
-        bg_color = self.get_random_color()
+        bg_color = self.get_background_color(ext)
         img = Image.new("RGB", size, color=bg_color)
         draw = ImageDraw.Draw(img)
 
         # Calculate font size (dynamic based on text length)
         font_size = min(size[0] // (len(ext) + 2), size[1] // 3)
-        font = ImageFont.truetype(
-            font=settings.THUMBNAIL_FONT_NAME,
-            size=font_size,
-            layout_engine=ImageFont.Layout.BASIC,
-        )
+        font = _load_font(settings.THUMBNAIL_FONT_NAME, font_size)
 
         # Get text size for centering
         text_bbox = draw.textbbox((0, 0), ext, font=font)
@@ -74,37 +142,73 @@ class MediaDocumentParser(DocumentParser):
         text_color = self.get_text_color(bg_color)
         draw.text((x, y), ext, font=font, fill=text_color)
 
-        # Save as WebP
-        out_path = self.tempdir / "thumb.webp"
-        img.save(out_path, format="WEBP")
+        # Save as WebP; lossless at the fastest level is both smaller and
+        # quicker to encode than lossy for a flat color + text image
+        img.save(out_path, format="WEBP", lossless=True, quality=0)
+
+        # Store the render for the next document with this extension. Write
+        # to a temporary name first so other workers never see a partial file.
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(out_path, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.logger.warning(f"Failed to cache thumbnail for {ext}: {e}")
+            tmp_path.unlink(missing_ok=True)
 
         return out_path
 
     def get_video_thumbnail(self, video_path: Path, mime_type, file_name=None) -> Path:
-        """Extract a frame from a video file to use as a thumbnail, if moviepy is available."""
+        """Extract a frame from a video file to use as a thumbnail, if PyAV is available."""
         try:
-            from moviepy.editor import VideoFileClip
+            import av
         except ImportError:
-            self.logger.warning("moviepy is not installed. Falling back to default icon generation.")
+            self.logger.warning("PyAV is not installed. Falling back to default icon generation.")
             return self.get_dynamic_thumbnail(video_path, mime_type, file_name)
 
         try:
-            # Load the video file
-            clip = VideoFileClip(str(video_path))
-
-            # Extract a frame at 30 seconds (or the middle if shorter)
-            frame_time = min(30, clip.duration / 2)
-            frame = clip.get_frame(frame_time)
-
-            # Convert the frame to an image
-            img = Image.fromarray(frame)
-
-            # Resize to thumbnail size
-            img.thumbnail((400, 400))
-
-            # Save as WebP
+            # Open the video file and decode with multiple threads
+            with av.open(str(video_path)) as container:
+                stream = container.streams.video[0]
+                stream.thread_type = "AUTO"
+
+                # Extract a frame at 30 seconds (or the middle if shorter)
+                if stream.duration is not None:
+                    duration = float(stream.duration * stream.time_base)
+                elif container.duration is not None:
+                    duration = container.duration / av.time_base
+                else:
+                    duration = 0
+                frame_time = min(30, duration / 2)
+
+                # Seek to the nearest keyframe before the target time, then
+                # decode forward until we reach it. Frames that no other frame
+                # references are never kept, so skip decoding them entirely.
+                stream.codec_context.skip_frame = "NONREF"
+                target_pts = int(frame_time / stream.time_base) + (stream.start_time or 0)
+                container.seek(target_pts, stream=stream, any_frame=False, backward=True)
+
+                frame = None
+                for frame in container.decode(stream):
+                    if frame.pts is None or frame.pts >= target_pts:
+                        break
+
+                if frame is None:
+                    raise ValueError("no video frames could be decoded")
+
+                # Resize to thumbnail size and convert from the decoder's
+                # native (usually YUV420) layout to RGB in a single
+                # libswscale pass
+                scale = min(400 / frame.width, 400 / frame.height, 1)
+                img = frame.to_image(
+                    width=max(1, round(frame.width * scale)),
+                    height=max(1, round(frame.height * scale)),
+                )
+
+            # Save as WebP with a faster encoder method than the default (4)
             out_path = self.tempdir / "thumb.webp"
-            img.save(out_path, format="WEBP")
+            img.save(out_path, format="WEBP", method=2, quality=80)
 
             return out_path
         except Exception as e:
@@ -112,14 +216,9 @@ class MediaDocumentParser(DocumentParser):
             return self.get_dynamic_thumbnail(video_path, mime_type, file_name)
 
     def parse(self, document_path, mime_type, file_name=None):
-        import re
-
         def is_meaningful_text(text):
-            # Remove non-printable characters
-            text = ''.join(c for c in text if c.isprintable())
-
             # Check if the text contains at least 5 recognizable words
-            words = re.findall(r'\b\w+\b', text)
+            words = _WORD_RE.findall(text)
             return len(words) >= 5
 
         try:
@@ -129,17 +228,11 @@ class MediaDocumentParser(DocumentParser):
                 return
 
             # Attempt to read only the first 5 KB of the file
-            with open(document_path, "rb") as file:
-                raw_data = file.read(5000)
-
-            # Try decoding the raw data to text
-            raw_text = raw_data.decode("utf-8", errors="ignore")
-
-            # Remove null bytes from the extracted text
-            sanitized_text = raw_text.replace("\x00", "")
+            raw_data = _read_head(document_path, 5000)
 
-            # Keep only standard characters (A-Z, a-z, 0-9, and standard special characters)
-            sanitized_text = re.sub(r"[^A-Za-z0-9!@#$%^&*()_+\-=\[\]{}\\|;:'\",<.>/?`~\\s]", "", sanitized_text)
+            # Keep only standard characters (A-Z, a-z, 0-9, whitespace and
+            # standard special characters); what is left is plain ASCII
+            sanitized_text = raw_data.translate(None, _SANITIZE_DELETE_BYTES).decode("ascii")
 
 
             if mime_type.startswith("text/"):
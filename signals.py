@@ -1,9 +1,11 @@
 import logging
+from contextlib import contextmanager
 
 # Add necessary imports for the signal receiver
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from documents.models import Document
+from types import MappingProxyType
 import os
 
 logger = logging.getLogger("paperless_media")
@@ -65,90 +67,106 @@ logger = logging.getLogger("paperless_media")
 # one used when saving the file (so you can allow the upload by having the
 # mime type, but then override the mime-type by listing a different one
 # higher in the list; see the .yaml and .yml entries)
-OUR_MIME_TYPES = {
+#
+# The entries are kept as (mime type, extension) pairs; the lookup tables
+# below are derived from them once at import. Both are exposed read-only
+# because the same objects are shared by every consumer declaration call
+# and document save instead of being copied.
+OUR_MIME_TYPES_RAW = (
     # Text formats
-    "text/xml": ".xml",
-    "text/yaml": ".yaml",
-    "text/yml": ".yml",
-    "text/ini": ".ini",
-    "text/x-sql-dump": ".sqldump",
-    "text/x-sql-dump-file": ".dump",
-    "text/x-sql": ".sql",
-    "text/json": ".json",
+    ("text/xml", ".xml"),
+    ("text/yaml", ".yaml"),
+    ("text/yml", ".yml"),
+    ("text/ini", ".ini"),
+    ("text/x-sql-dump", ".sqldump"),
+    ("text/x-sql-dump-file", ".dump"),
+    ("text/x-sql", ".sql"),
+    ("text/json", ".json"),
 
     # Programming files
-    "text/html": ".html",
-    "text/htm": ".htm",
-    "text/css": ".css",
-    "application/x-perl": ".pl",
-    "application/x-php": ".php",
-    "application/x-httpd-php": ".php",
-    "text/x-python": ".py",
-    "application/x-python-code": ".py",
-    "text/javascript": ".js",
+    ("text/html", ".html"),
+    ("text/htm", ".htm"),
+    ("text/css", ".css"),
+    ("application/x-perl", ".pl"),
+    ("application/x-php", ".php"),
+    ("application/x-httpd-php", ".php"),
+    ("text/x-python", ".py"),
+    ("application/x-python-code", ".py"),
+    ("text/javascript", ".js"),
 
     # Audio formats
-    "audio/mpeg": ".mp3",
-    "audio/wav": ".wav",
-    "audio/ogg": ".ogg",
-    "audio/aac": ".aac",
-    "audio/midi": ".midi",
-    "audio/x-mpeg": ".mp3",
-    "audio/x-ms-wma": ".wma",
-    "audio/x-wav": ".wav",
+    ("audio/mpeg", ".mp3"),
+    ("audio/wav", ".wav"),
+    ("audio/ogg", ".ogg"),
+    ("audio/aac", ".aac"),
+    ("audio/midi", ".midi"),
+    ("audio/x-mpeg", ".mp3"),
+    ("audio/x-ms-wma", ".wma"),
+    ("audio/x-wav", ".wav"),
 
     # Video formats
-    "video/mp4": ".mp4",
-    "video/mpeg": ".mpg",
-    "video/webm": ".webm",
-    "video/quicktime": ".mov",
-    "video/quicktime-qt": ".qt",
-    "video/avi": ".avi",
-    "video/x-msvideo": ".avi",
-    "video/x-ms-wmv": ".wmv",
-    "video/x-ms-wmx": ".wmx",
+    ("video/mp4", ".mp4"),
+    ("video/mpeg", ".mpg"),
+    ("video/webm", ".webm"),
+    ("video/quicktime", ".mov"),
+    ("video/quicktime-qt", ".qt"),
+    ("video/avi", ".avi"),
+    ("video/x-msvideo", ".avi"),
+    ("video/x-ms-wmv", ".wmv"),
+    ("video/x-ms-wmx", ".wmx"),
 
     # Archive formats
-    "application/zip": ".zip",
-    "application/x-zip": ".zip",
-    "application/x-rar-compressed": ".rar",
-    "application/x-7z-compressed": ".7z",
-    "application/x-tar": ".tar",
-    "application/gzip": ".gz",
-    "application/x-sea": ".sea",
-    "application/x-sit": ".sit",
+    ("application/zip", ".zip"),
+    ("application/x-zip", ".zip"),
+    ("application/x-rar-compressed", ".rar"),
+    ("application/x-7z-compressed", ".7z"),
+    ("application/x-tar", ".tar"),
+    ("application/gzip", ".gz"),
+    ("application/x-sea", ".sea"),
+    ("application/x-sit", ".sit"),
 
     # Document formats (additional to native support)
-    "application/rtf": ".rtf",
-    "application/x-latex": ".tex",
-    "application/json": ".json",
-    "application/yaml": ".yaml",
-    "application/x-yaml": ".yaml",
-    "application/xml": ".xml",
+    ("application/rtf", ".rtf"),
+    ("application/x-latex", ".tex"),
+    ("application/json", ".json"),
+    ("application/yaml", ".yaml"),
+    ("application/x-yaml", ".yaml"),
+    ("application/xml", ".xml"),
 
     # Presentation and publication formats
-    "application/epub+zip": ".epub",
+    ("application/epub+zip", ".epub"),
 
     # Photoshop formats
-    "image/vnd.adobe.photoshop": ".psd",
-    "application/x-photoshop": ".psd",
-    "application/postscript": ".eps",
+    ("image/vnd.adobe.photoshop", ".psd"),
+    ("application/x-photoshop", ".psd"),
+    ("application/postscript", ".eps"),
 
     # Executables
-    "application/x-msdownload": ".exe",
+    ("application/x-msdownload", ".exe"),
 
     # Other formats
-    "application/octet-stream": "",
+    ("application/octet-stream", ""),
     
     # application/octet-stream custom handling
-    "application/x-affinity-designer": ".afdesign",
-    "application/x-affinity-photo": ".afphoto",
-    "application/x-affinity-publisher": ".afpub",
-    "application/x-affinity-template": ".aftemplate",
-    "application/x-mac-dmg": ".dmg",
-    "application/postscript-ps": ".ps",
-    "application/postscript-ai": ".ai",
-}
+    ("application/x-affinity-designer", ".afdesign"),
+    ("application/x-affinity-photo", ".afphoto"),
+    ("application/x-affinity-publisher", ".afpub"),
+    ("application/x-affinity-template", ".aftemplate"),
+    ("application/x-mac-dmg", ".dmg"),
+    ("application/postscript-ps", ".ps"),
+    ("application/postscript-ai", ".ai"),
+)
+
+OUR_MIME_TYPES = MappingProxyType(dict(OUR_MIME_TYPES_RAW))
+
+# Reverse index (extension -> mime type) used by the pre-save handler.
+# setdefault keeps the first listed mime type for each extension, matching
+# the "highest in the list wins" rule described above.
+_ext_to_mime = {}
+for _mime, _ext in OUR_MIME_TYPES_RAW:
+    _ext_to_mime.setdefault(_ext, _mime)
+EXT_TO_MIME = MappingProxyType(_ext_to_mime)
+del _ext_to_mime, _mime, _ext
 
 def get_parser(*args, **kwargs):
     from paperless_media.parsers import MediaDocumentParser
@@ -171,13 +189,8 @@ def correct_mime_type_receiver(sender, instance: Document, **kwargs):
     _filename, extension = os.path.splitext(instance.original_filename)
     extension = extension.lower()
 
-    # Use the external dictionary for checks if needed
-    # Example: Check if the extension matches one in our custom list
-    matched_mime = None
-    for mime, ext in OUR_MIME_TYPES.items():
-        if extension == ext:
-            matched_mime = mime
-            break
+    # Check if the extension matches one in our custom list
+    matched_mime = EXT_TO_MIME.get(extension)
 
     if matched_mime:
         new_mime_type = matched_mime # Use the matched MIME type
@@ -185,3 +198,24 @@ def correct_mime_type_receiver(sender, instance: Document, **kwargs):
         # Only change if different from what was detected
         if instance.mime_type != new_mime_type:
             instance.mime_type = new_mime_type
+
+
+@contextmanager
+def disable_mime_correction():
+    """
+    Temporarily disconnect the pre-save mime type handler, e.g. while bulk
+    importing documents whose mime types are already correct:
+
+        with disable_mime_correction():
+            for document in documents:
+                document.save()
+
+    Nested use is safe: only the block that actually disconnected the
+    handler reconnects it.
+    """
+    disconnected = pre_save.disconnect(correct_mime_type_receiver, sender=Document)
+    try:
+        yield
+    finally:
+        if disconnected:
+            pre_save.connect(correct_mime_type_receiver, sender=Document)